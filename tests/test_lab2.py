@@ -0,0 +1,77 @@
+import numpy as np
+import matplotlib.pyplot as plt
+import tsbb15_labs.lab2 as lab2
+
+
+def test_gopimage():
+    rng = np.random.RandomState(0)
+    V = rng.randn(150, 80, 2)
+    V_orig = V.copy()
+    ax, imh, gopim = lab2.gopimage(V)
+    assert gopim.shape == (150, 80, 3)
+    assert gopim.min() >= 0 and gopim.max() <= 1
+    assert (V == V_orig).all()
+
+    # Reference computed on the whole image at once, spanning several bands
+    Vx, Vy = V[..., 0].astype(np.float32), V[..., 1].astype(np.float32)
+    mag = np.hypot(Vx, Vy)
+    angle = np.mod(np.arctan2(Vy, Vx), 2*np.pi)
+    idx = (angle * (len(lab2.GOPTABLE) / (2*np.pi)) + 0.5).astype(int) % len(lab2.GOPTABLE)
+    expected = lab2.GOPTABLE[idx] * (mag / mag.max())[..., None]
+    assert np.allclose(gopim, expected, atol=1e-6)
+
+    W = V[..., 0] + 1j * V[..., 1]
+    W_orig = W.copy()
+    _, _, gopim_complex = lab2.gopimage(W, ax=ax)
+    assert (W == W_orig).all()
+    assert np.allclose(gopim, gopim_complex)
+    plt.close(ax.figure)
+
+
+def test_gopimage_direction_and_scale():
+    V = np.zeros((3, 4, 2))
+    V[..., 0] = 1
+    V[0, :, 0] = 0.5
+    ax, _, gopim = lab2.gopimage(V)
+    assert np.allclose(gopim[1:], lab2.GOPTABLE[0])
+    assert np.allclose(gopim[0], 0.5 * lab2.GOPTABLE[0])
+
+    # Magnitudes are clipped to 1 after scaling
+    _, _, gopim = lab2.gopimage(V, scale=4, ax=ax)
+    assert np.allclose(gopim, lab2.GOPTABLE[0])
+    plt.close(ax.figure)
+
+
+def test_gopimage_zero():
+    ax, _, gopim = lab2.gopimage(np.zeros((5, 6, 2)))
+    assert gopim.shape == (5, 6, 3)
+    assert (gopim == 0).all()
+    plt.close(ax.figure)
+
+
+def test_image_grid_masked():
+    im = np.ma.masked_greater(np.arange(12.).reshape(3, 4), 9)
+    axes = lab2.image_grid([im])
+    handle = axes[0].images[0]
+    assert (handle.norm.vmin, handle.norm.vmax) == (0, 9)
+    assert np.ma.getmaskarray(handle.get_array()).sum() == 2
+    plt.close(axes[0].figure)
+
+
+def test_image_grid():
+    ims = [np.full((4, 5), v) for v in (-1., 2., 3.)]
+
+    # Generator input, with a single shared colorbar
+    axes = lab2.image_grid(im for im in ims)
+    assert len(axes) == 3
+    handles = [ax.images[0] for ax in axes]
+    assert all((h.norm.vmin, h.norm.vmax) == (-1, 3) for h in handles)
+    assert sum(h.colorbar is not None for h in handles) == 1
+    plt.close(axes[0].figure)
+
+    # Dict input, with separate colorbars
+    axes = lab2.image_grid({'A': ims[0], 'B': ims[1]}, separate_colorbars=True)
+    assert len(axes) == 2
+    assert [ax.get_title() for ax in axes] == ['A', 'B']
+    assert all(ax.images[0].colorbar is not None for ax in axes)
+    plt.close(axes[0].figure)
@@ -9,3 +9,23 @@ def test_stereo_pair():
     pair = lab3.load_stereo_pair()
     assert len(pair) == 2
     assert pair[0].shape == (683,1024)
+
+def test_load_image_grayscale_cached():
+    path = lab3.LAB3_IMAGE_DIRECTORY / 'img1.png'
+    img = lab3.load_image_grayscale(path)
+    assert lab3.load_image_grayscale(str(path)) is img
+    assert not img.flags.writeable
+
+
+def test_load_image_grayscale_cached_relative(monkeypatch):
+    monkeypatch.chdir(lab3.LAB3_IMAGE_DIRECTORY)
+    img = lab3.load_image_grayscale('img1.png')
+    assert lab3.load_image_grayscale(lab3.LAB3_IMAGE_DIRECTORY / 'img1.png') is img
+    monkeypatch.chdir(IMAGE_DIRECTORY / 'chessboard')
+    assert lab3.load_image_grayscale('img1.png') is not img
+
+def test_load_image_grayscale_region():
+    path = lab3.LAB3_IMAGE_DIRECTORY / 'img1.png'
+    region = lab3.load_image_grayscale_region(path, (10, 20, 110, 70))
+    assert region.shape == (50, 100)
+    assert (region == lab3.load_image_grayscale(path)[20:70, 10:110]).all()
@@ -7,8 +7,6 @@ import matplotlib.pyplot as plt
 import matplotlib.colors
 from mpl_toolkits.axes_grid1 import ImageGrid
 
-import scipy.interpolate
-
 from tsbb15_labs import IMAGE_DIRECTORY
 
 def load_image_grayscale(path):
@@ -27,7 +25,7 @@ def image_grid(images, nrows=1, ncols=None, separate_colorbars=False, share_all=
     
     Parameters
     --------------
-    images : list or dict
+    images : iterable or dict
             Images to plot. If a dict, the format is {'name1': im1, 'name2': im2}
     
     nrows : int
@@ -55,7 +53,13 @@ def image_grid(images, nrows=1, ncols=None, separate_colorbars=False, share_all=
     try:
         names, images = images.keys(), images.values()
     except AttributeError:
-        names = [None] * len(images)
+        names = None
+    
+    # Materialize once, so that iterators are not exhausted before plotting.
+    # np.asanyarray does not copy images that already are arrays, and keeps
+    # subclasses such as masked arrays
+    images = [np.asanyarray(im) for im in images]
+    names = list(names) if names is not None else [None] * len(images)
     
     if not ncols:
         ncols = int(np.ceil(len(images) / nrows))
@@ -63,9 +67,12 @@ def image_grid(images, nrows=1, ncols=None, separate_colorbars=False, share_all=
     if separate_colorbars:
         norm = None
     else:
-        vmin = min(np.min(im) for im in images)
-        vmax = max(np.max(im) for im in images)
-        norm = matplotlib.colors.Normalize(vmax=vmax, vmin=vmin)
+        # Shared color range, found in a single pass over the images
+        vmin, vmax = np.inf, -np.inf
+        for im in images:
+            vmin = min(vmin, im.min())
+            vmax = max(vmax, im.max())
+        norm = matplotlib.colors.Normalize(vmax=float(vmax), vmin=float(vmin))
     
     fig = plt.figure()
     cbar_mode = 'each' if separate_colorbars else 'single'
@@ -76,9 +83,15 @@ def image_grid(images, nrows=1, ncols=None, separate_colorbars=False, share_all=
         handle = ax.imshow(im, norm=norm, **imshow_opts)
         if name:
             ax.set_title(name)    
+        if separate_colorbars:
+            ax.cax.colorbar(handle)
+            ax.cax.toggle_label(True)
+        axes.append(ax)
+    
+    # All axes share the same colorbar axes, so the shared colorbar is drawn once
+    if not separate_colorbars and axes:
         ax.cax.colorbar(handle)
         ax.cax.toggle_label(True)
-        axes.append(ax)
         
     return axes
 
@@ -96,46 +109,78 @@ def gopimage(V, scale=1, ax=None):
     ax : Axes
         Axes object to plot to, or None to create a new figure        
     
+    Returns
+    ----------------
+    ax : Axes
+        The Axes object. When called in a loop without an Axes, close the
+        new figure with plt.close(ax.figure) when done with it
+    imh : AxesImage
+        Handle of the displayed image
+    gopim : array of shape (R, C, 3)
+        The color image
+    
     Original MATLAB implementation by Gunnar Farnebäck, CVL, Linköping University
     Python re-implementation by Hannes Ovrén, CVL, Linköping University, 2018
     """
     
-    if V.ndim == 2 and V.dtype == np.complex:
-        W = V
+    # Separate real x and y components. The input is never modified.
+    # Single precision is plenty for display
+    V = np.asarray(V)
+    if V.ndim == 2 and np.iscomplexobj(V):
+        Wx = V.real.astype(np.float32, copy=False)
+        Wy = V.imag.astype(np.float32, copy=False)
     elif V.ndim == 3 and V.shape[2] == 2:
-        Vx = V[..., 0]
-        Vy = V[..., 1]
-        
-        # Complex representation
-        W = Vx + 1j * Vy
+        Wx = V[..., 0].astype(np.float32, copy=False)
+        Wy = V[..., 1].astype(np.float32, copy=False)
     else:
         raise ValueError("Input must be real MxNx2 array, or complex MxN array")
         
         
-    max_mag = np.max(np.abs(W))
+    rows, cols = Wx.shape
+    
+    # Largest magnitude, for normalization
+    max_mag = 0
+    for r0 in range(0, rows, _GOPIMAGE_BAND_ROWS):
+        band = slice(r0, r0 + _GOPIMAGE_BAND_ROWS)
+        max_mag = max(max_mag, np.max(np.hypot(Wx[band], Wy[band])))
+    
+    # Normalization and scaling as a single factor
+    mag_scale = scale / max_mag if max_mag else 0
     
-    #Normalize magnitude
-    if not max_mag == 0:
-        W /= max_mag
+    # The image is computed in bands of rows, so that all temporaries
+    # are small enough to stay in cache
+    gopim = np.empty((rows, cols, 3), dtype=np.float32)
+    for r0 in range(0, rows, _GOPIMAGE_BAND_ROWS):
+        band = slice(r0, r0 + _GOPIMAGE_BAND_ROWS)
+        Bx, By = Wx[band], Wy[band]
+        
+        # Magnitude, updated in place
+        abs_w = np.hypot(Bx, By)
+        abs_w *= mag_scale
+        np.minimum(abs_w, 1, out=abs_w)
 
-    # Setu colortable with 257 entries. Last is to make it cyclic (2pi equivalent with 0)
-    gtab = np.vstack((GOPTABLE, GOPTABLE[0]))
-    gtab_angles = 2 * np.pi * np.arange(256 + 1) / 256;
-    cmap_table = scipy.interpolate.interp1d(gtab_angles, gtab, axis=0)
+        # Angle in [0, 2pi)
+        angle_w = np.arctan2(By, Bx)
+        np.mod(angle_w, 2*np.pi, out=angle_w)
 
+        # Nearest colortable entry (round, then truncate). 2pi wraps around to entry 0
+        angle_w *= _GOPTABLE_INDEX_SCALE
+        angle_w += 0.5
+        idx = angle_w.astype(np.intp)
         
-    abs_w = np.minimum(1, scale * np.abs(W))
-    angle_w = np.clip(np.pi + np.angle(-W), 0, 2*np.pi)
-    rows, cols = V.shape[:2]
-    angle_im = cmap_table(angle_w.flat).reshape(rows, cols, 3)
-    
-    gopim = np.atleast_3d(abs_w) * angle_im
+        # Gather colors straight into the output and scale them in place.
+        # mode='wrap' does the wrap-around and lets np.take write to out
+        # without an intermediate buffer
+        gopim_band = gopim[band]
+        np.take(GOPTABLE, idx, axis=0, out=gopim_band, mode='wrap')
+        gopim_band *= abs_w[..., None]
     
     if ax is None:
         _, ax = plt.subplots()
     
     imh = ax.imshow(gopim)
     
+    return ax, imh, gopim
     
 ### gopimage colormap table
 GOPTABLE = np.array([[0.28125   , 0.90234375, 0.140625  ],
@@ -393,4 +438,10 @@ GOPTABLE = np.array([[0.28125   , 0.90234375, 0.140625  ],
        [0.3359375 , 0.875     , 0.10546875],
        [0.3203125 , 0.8828125 , 0.11328125],
        [0.30859375, 0.88671875, 0.12109375],
-       [0.29296875, 0.89453125, 0.12890625]])        
+       [0.29296875, 0.89453125, 0.12890625]], dtype=np.float32)
+
+# Angle to colortable index conversion for gopimage
+_GOPTABLE_INDEX_SCALE = len(GOPTABLE) / (2 * np.pi)
+
+# Number of image rows processed at a time by gopimage
+_GOPIMAGE_BAND_ROWS = 64
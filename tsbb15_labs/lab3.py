@@ -11,6 +11,7 @@ Written by Hannes Ovrén, 2016
 Minor updates by Johan Edstedt, 2020
 """
 
+import functools
 import os
 import warnings
 from pathlib import Path
@@ -35,9 +36,40 @@ except AttributeError:
 
 LAB3_IMAGE_DIRECTORY = Path(os.path.join(IMAGE_DIRECTORY,'lab3'))
 
+@functools.lru_cache(maxsize=64)
+def _load_image_grayscale_cached(path, mtime):
+    img = np.asarray(Image.open(path).convert('L'))
+    img.setflags(write=False)
+    return img
+
 def load_image_grayscale(path):
-    "Load a grayscale image by path"
-    return np.asarray(Image.open(path).convert('L'))
+    """Load a grayscale image by path
+
+    Images are cached until the file is modified. The returned array is
+    read-only, make a copy before modifying it.
+    """
+    # Absolute path, so that equal relative paths from different
+    # working directories do not share a cache entry
+    path = os.path.abspath(os.fspath(path))
+    return _load_image_grayscale_cached(path, os.path.getmtime(path))
+
+def load_image_grayscale_region(path, box=None):
+    """Load a region of a grayscale image by path
+
+    The image is cropped before conversion, so only the region is
+    converted to grayscale and copied into the array.
+
+    Parameters
+    ----------------
+    path : str or Path
+        Path to the image
+    box : tuple of 4 ints
+        Region as (left, upper, right, lower), or None to load the whole image
+    """
+    img = Image.open(path)
+    if box is not None:
+        img = img.crop(box)
+    return np.asarray(img.convert('L'))
 
 def load_stereo_pair():
     """Load stereo image pair